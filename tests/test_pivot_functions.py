@@ -0,0 +1,333 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pivot_functions as pf
+
+TITANIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "titanic.csv")
+
+CASES = [
+    dict(aggregation_col="Age", index_col="Pclass", columns="Sex"),
+    dict(aggregation_col="Fare", index_col="Pclass", columns=["Sex", "Embarked"]),
+    dict(aggregation_col=["Age", "Fare"], index_col=["Pclass", "Sex"]),
+    dict(aggregation_col=["Age", "Fare"], index_col="Embarked", columns="Sex"),
+    dict(aggregation_col="Survived", index_col="Sex", columns="SibSp", fill_val=0),
+    dict(aggregation_col=["Age", "Fare"], index_col="Pclass", columns="Cabin", fill_val=-1),
+]
+
+
+def expected_pivot(table, aggregation_col, index_col, columns=None, fill_val=None):
+    """Reference result from pd.pivot_table."""
+    return pd.pivot_table(table, values=pf._as_list(aggregation_col), index=pf._as_list(index_col),
+                          columns=pf._as_list(columns), aggfunc="mean", fill_value=fill_val)
+
+
+def assert_same_pivot(got, expected, check_label_types=True):
+    """Compares pivots ignoring row/column order and sparse storage."""
+    got = got.astype({col: dtype.subtype for col, dtype in got.dtypes.items() if isinstance(dtype, pd.SparseDtype)})
+    label_type = "equiv" if check_label_types else False
+    pd.testing.assert_frame_equal(got.sort_index().sort_index(axis=1), expected.sort_index().sort_index(axis=1),
+                                  check_index_type=label_type, check_column_type=label_type)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keeps the Parquet cache of read_table out of the user's cache directory."""
+    monkeypatch.setattr(pf, "_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def titanic():
+    return pd.read_csv(TITANIC)
+
+
+@pytest.fixture(params=["bincount", "groupby", "parallel", "polars"])
+def backend(request, monkeypatch):
+    """Forces make_pivot_table onto one aggregation path by lowering its row threshold."""
+    monkeypatch.setattr(pf.os, "cpu_count", lambda: 4)
+    if request.param == "polars":
+        pytest.importorskip("polars")
+        pytest.importorskip("pyarrow")
+        monkeypatch.setattr(pf, "_POLARS_MIN_ROWS", 0)
+    else:
+        monkeypatch.setattr(pf, "_POLARS_MIN_ROWS", float("inf"))
+    if request.param == "groupby":
+        monkeypatch.setattr(pf, "_BINCOUNT_MAX_BINS", 0)
+    if request.param == "parallel":
+        monkeypatch.setattr(pf, "_PARALLEL_MIN_ROWS", 0)
+    else:
+        monkeypatch.setattr(pf, "_PARALLEL_MIN_ROWS", float("inf"))
+    return request.param
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_matches_pivot_table(titanic, backend, case):
+    assert_same_pivot(pf.make_pivot_table(titanic, **case), expected_pivot(titanic, **case))
+
+
+@pytest.mark.parametrize("case", CASES[:4])
+def test_matches_pivot_table_on_shuffled_arrow_table(backend, case):
+    table = pf.read_table(TITANIC).sample(frac=1, random_state=0)
+    # Arrow-backed keys keep their Arrow dtypes, the values become float64 means
+    assert_same_pivot(pf.make_pivot_table(table, **case), expected_pivot(pd.read_csv(TITANIC), **case),
+                      check_label_types=False)
+
+
+def test_matches_pivot_table_value_dtypes(titanic, backend):
+    table = titanic.astype({"SibSp": "Int64", "Fare": "float32"})
+    case = dict(aggregation_col=["SibSp", "Fare", "Age"], index_col="Pclass", columns="Sex")
+    assert_same_pivot(pf.make_pivot_table(table, **case), expected_pivot(table, **case))
+
+
+def test_polars_import_error_falls_back(titanic, monkeypatch):
+    def missing(*args):
+        raise ImportError("No module named 'pyarrow'")
+
+    monkeypatch.setattr(pf, "_HAS_POLARS", True)
+    monkeypatch.setattr(pf, "_POLARS_MIN_ROWS", 0)
+    monkeypatch.setattr(pf.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(pf, "_polars_means", missing)
+    case = CASES[0]
+    assert_same_pivot(pf.make_pivot_table(titanic, **case), expected_pivot(titanic, **case))
+
+
+def test_sort_orders_result(titanic, backend):
+    pivot = pf.make_pivot_table(titanic, "Fare", "Embarked", "Sex", sort=True)
+    assert pivot.index.tolist() == ["C", "Q", "S"]
+    assert pivot.columns.get_level_values("Sex").tolist() == ["female", "male"]
+
+
+def test_sparse_only_when_mostly_empty():
+    table = pd.DataFrame({"a": list("xxyyzz"), "b": list("pqpqpq"), **{f"v{i}": np.arange(6.0) for i in range(11)}})
+    dense = pf.make_pivot_table(table, [f"v{i}" for i in range(11)], "a", "b")
+    assert not any(isinstance(dtype, pd.SparseDtype) for dtype in dense.dtypes)
+
+    sparse = pf.make_pivot_table(pd.read_csv(TITANIC), "Fare", "Name", "Cabin")
+    assert all(isinstance(dtype, pd.SparseDtype) for dtype in sparse.dtypes)
+
+
+def test_sparse_keeps_column_dtypes(titanic, backend):
+    table = titanic.astype({"Fare": "float32", "SibSp": "Int64"})
+    case = dict(aggregation_col=["Fare", "Age", "SibSp"], index_col="Name", columns="Cabin")
+    pivot = pf.make_pivot_table(table, **case, low_precision=True)
+    assert pivot["Fare"].dtypes.unique().tolist() == [pd.SparseDtype("float32", np.nan)]
+    assert pivot["Age"].dtypes.unique().tolist() == [pd.SparseDtype("float32", np.nan)]
+    assert pivot["SibSp"].dtypes.unique().tolist() == [pd.Float64Dtype()]
+    assert_same_pivot(pivot, expected_pivot(table.astype({"Age": "float32"}), **case))
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A copy of titanic.csv, so that the cache key does not depend on the checkout."""
+    path = str(tmp_path / "titanic.csv")
+    shutil.copy(TITANIC, path)
+    return path
+
+
+def test_read_table_served_from_cache(source, cache_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    first = pf.read_table(source, {"Pclass", "Sex", "Fare"})
+    assert len(os.listdir(cache_dir)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("source file parsed again")
+
+    monkeypatch.setattr(pf, "_read_columns", fail)
+    second = pf.read_table(source, ["Fare", "Sex", "Pclass"])
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_read_table_cache_is_private_and_bounded(source, cache_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(pf, "_CACHE_MAX_FILES", 2)
+    for columns in ["Pclass", "Sex", "Fare"]:
+        pf.read_table(source, columns)
+    assert len(os.listdir(cache_dir)) == 2
+    if hasattr(os, "getuid"):
+        assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+
+def test_read_table_cache_opt_out(source, cache_dir, monkeypatch):
+    pf.read_table(source, cache=False)
+    monkeypatch.setenv("PIVOT_FUNCTIONS_CACHE", "0")
+    pf.read_table(source)
+    assert not cache_dir.exists() or not os.listdir(cache_dir)
+
+
+def run_main(monkeypatch, capsys, *answers):
+    """Runs main() with the given answers to its prompts and returns what it printed."""
+    prompts = iter(answers)
+    monkeypatch.setattr("builtins.input", lambda: next(prompts))
+    pf.main()
+    return capsys.readouterr().out
+
+
+@pytest.fixture
+def loaded_columns(monkeypatch):
+    """Records the columns main() asks read_table to load."""
+    calls = []
+    read_table = pf.read_table
+
+    def spy(source_path, columns=None, **kwargs):
+        calls.append(columns)
+        return read_table(source_path, columns, **kwargs)
+
+    monkeypatch.setattr(pf, "read_table", spy)
+    return calls
+
+
+def test_main_loads_only_used_columns(monkeypatch, capsys, loaded_columns):
+    out = run_main(monkeypatch, capsys, TITANIC, "Pclass", "Sex, Embarked", "Fare", "", "")
+    assert loaded_columns == [["Pclass", "Sex", "Embarked", "Fare"]]
+    assert "Pivot table(mean aggregation)" in out
+
+
+def test_main_loads_all_columns_for_auto_selection(monkeypatch, capsys, loaded_columns):
+    out = run_main(monkeypatch, capsys, TITANIC, "", "", "", "", "")
+    assert loaded_columns == [None]
+    assert "Pivot table(mean aggregation)" in out
+
+
+def test_main_reports_missing_column_before_other_prompts(monkeypatch, capsys, loaded_columns):
+    out = run_main(monkeypatch, capsys, TITANIC, "Pclas", "Sex", "Age")
+    assert loaded_columns == [["Pclas", "Sex", "Age"]]
+    assert "Error:" in out and "Pclas" in out
+    assert "fill value" not in out
+
+
+def test_keeps_key_dtypes(titanic, backend):
+    pivot = pf.make_pivot_table(titanic, "Fare", ["Embarked", "Sex"], "Pclass")
+    assert pivot.index.levels[0].dtype == titanic["Embarked"].dtype
+    assert pivot.index.levels[1].dtype == titanic["Sex"].dtype
+    assert pivot.columns.get_level_values("Pclass").dtype == titanic["Pclass"].dtype
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_chunked_pivot_matches_pivot_table(titanic, case):
+    assert_same_pivot(pf.chunked_pivot(TITANIC, chunksize=100, **case), expected_pivot(titanic, **case))
+
+
+@pytest.mark.parametrize("keys", ["1,2,,1,A,1", "1,2,,1,1.0,3", "1,2,1,1,3,3"])
+def test_chunked_pivot_keys_typed_over_whole_file(tmp_path, keys):
+    path = tmp_path / "keys.csv"
+    path.write_text("k,v\n" + "".join(f"{k},{v}\n" for v, k in enumerate(keys.split(","), 1)))
+    # With 2-row chunks the first chunk parses k as int, later ones as float or str
+    assert_same_pivot(pf.chunked_pivot(str(path), "v", "k", chunksize=2), expected_pivot(pd.read_csv(path), "v", "k"))
+
+
+def test_chunked_pivot_empty_table(tmp_path):
+    path = tmp_path / "header_only.csv"
+    path.write_text("k,v\n")
+    with pytest.raises(ValueError, match="Empty table"):
+        pf.chunked_pivot(str(path), "v", "k")
+
+
+def test_low_precision_dtypes(titanic, backend):
+    case = dict(aggregation_col=["Fare", "Age", "SibSp"], index_col="Pclass", columns="Sex")
+    assert pf.make_pivot_table(titanic, **case).dtypes.unique().tolist() == [np.float64]
+    pivot = pf.make_pivot_table(titanic, **case, low_precision=True)
+    # Only float64 columns are aggregated as float32, integer columns keep float64 means
+    assert pivot["Fare"].dtypes.unique().tolist() == [np.float32]
+    assert pivot["Age"].dtypes.unique().tolist() == [np.float32]
+    assert pivot["SibSp"].dtypes.unique().tolist() == [np.float64]
+    expected = expected_pivot(titanic, **case)
+    np.testing.assert_allclose(pivot.sort_index().sort_index(axis=1), expected.sort_index().sort_index(axis=1), rtol=1e-6)
+
+
+@pytest.mark.parametrize("text, cols", [
+    ("Sex", ["Sex"]),
+    (" Sex , Embarked ", ["Sex", "Embarked"]),
+    ("Sex,,Embarked,", ["Sex", "Embarked"]),
+    ("", None),
+    (" , ", None),
+])
+def test_split_cols(text, cols):
+    assert pf._split_cols(text) == cols
+
+
+def test_read_table_arrow_dtypes():
+    pytest.importorskip("pyarrow")
+    table = pf.read_table(TITANIC, cache=False)
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in table.dtypes)
+
+
+def test_read_table_missing_column():
+    with pytest.raises(ValueError, match="Pclas"):
+        pf.read_table(TITANIC, ["Pclas", "Sex"], cache=False)
+
+
+def test_low_precision_arrow_floats():
+    pytest.importorskip("pyarrow")
+    table = pf.read_table(TITANIC, cache=False)
+    pivot = pf.make_pivot_table(table, ["Fare", "SibSp"], "Pclass", "Sex", low_precision=True)
+    assert pivot["Fare"].dtypes.unique().tolist() == [np.float32]
+    assert pivot["SibSp"].dtypes.unique().tolist() == [np.float64]
+
+
+@pytest.mark.parametrize("labels, compact", [
+    ([3, 4, 5], True),
+    ([3, 5, 6], False),
+    ([5, 4, 3], False),
+    (["a", "b"], False),
+    ([1.0, 2.0], False),
+])
+def test_compact_index(labels, compact):
+    index = pd.Index(labels, name="k")
+    result = pf._compact_index(index)
+    assert isinstance(result, pd.RangeIndex) == compact
+    pd.testing.assert_index_equal(result, index, exact=False)
+
+
+def test_pivot_index_compacted(titanic):
+    # Narrow integer keys are their own bincount codes, so their groups come out in order
+    pivot = pf.make_pivot_table(titanic, "Fare", "Pclass", "Sex")
+    assert isinstance(pivot.index, pd.RangeIndex)
+    assert pivot.index.name == "Pclass" and list(pivot.index) == [1, 2, 3]
+
+
+@pytest.fixture
+def small_table():
+    return pd.DataFrame({"k": ["a", "b", "a"], "g": ["x", "x", "y"], "v": [1, 2, 3]})
+
+
+@pytest.mark.parametrize("ext, write", [(".parquet", "to_parquet"), (".feather", "to_feather")])
+def test_read_table_columnar(tmp_path, cache_dir, small_table, ext, write):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / f"table{ext}")
+    getattr(small_table, write)(path)
+    table = pf.read_table(path, ["k", "v"])
+    assert table.columns.tolist() == ["k", "v"]
+    assert table["v"].tolist() == [1, 2, 3]
+    # Columnar files are fast to load and are not cached
+    assert not cache_dir.exists() or not os.listdir(cache_dir)
+
+
+def test_read_table_unsupported(tmp_path):
+    path = tmp_path / "table.txt"
+    path.write_text("k,v\n")
+    with pytest.raises(TypeError):
+        pf.read_table(str(path))
+    with pytest.raises(FileNotFoundError):
+        pf.read_table(str(tmp_path / "missing.csv"))
+
+
+@pytest.mark.parametrize("ext", [".xlsx", ".xls"])
+def test_read_table_excel_with_calamine(tmp_path, small_table, ext):
+    pytest.importorskip("python_calamine")
+    pytest.importorskip("openpyxl")
+    # calamine detects the workbook format from the content, so an .xlsx workbook stands in for .xls
+    path = str(tmp_path / f"table{ext}")
+    small_table.to_excel(str(tmp_path / "table.xlsx"), index=False)
+    if ext != ".xlsx":
+        shutil.copy(str(tmp_path / "table.xlsx"), path)
+    assert pf._readers()[ext].keywords["engine"] == "calamine"
+    table = pf.read_table(path, ["k", "v"], cache=False)
+    assert table.columns.tolist() == ["k", "v"]
+    assert table["k"].tolist() == ["a", "b", "a"] and table["v"].tolist() == [1, 2, 3]